@@ -0,0 +1,204 @@
+import importlib.util
+import math
+import os
+import sys
+import tempfile
+import threading
+from functools import lru_cache
+from itertools import accumulate, combinations
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from numba import config, njit, prange
+
+# Kernels are launched from Streamlit's per-session script threads; prefer the
+# thread-safe OpenMP layer, which also shuts down cleanly from non-main threads
+config.THREADING_LAYER_PRIORITY = ["omp", "tbb", "workqueue"]
+
+ParamItems = Tuple[Tuple[str, Tuple[str, ...]], ...]
+
+def freeze_parameters(parameters: Dict[str, List[str]]) -> ParamItems:
+    # Hashable snapshot of the parameters, keeping their column order
+    return tuple((param, tuple(values)) for param, values in parameters.items())
+
+@lru_cache(maxsize=64)
+def encode_parameters(param_items: ParamItems) -> Tuple[Tuple[str, ...], Tuple[int, ...], Dict[Tuple[str, str], int]]:
+    # Global 0..V-1 id per (parameter, value); ids grow with the parameter order,
+    # so each parameter owns the contiguous block of ids after the previous one.
+    # The returned dict is shared between callers and must not be modified.
+    keys = tuple(param for param, _ in param_items)
+    sizes = tuple(len(values) for _, values in param_items)
+    value_ids = {}
+    for param, values in param_items:
+        for value in values:
+            value_ids[(param, value)] = len(value_ids)
+    return keys, sizes, value_ids
+
+def value_starts(sizes: List[int]) -> List[int]:
+    # First global value id of each parameter's contiguous block
+    return [0, *accumulate(sizes)][:-1]
+
+def encode_pair(first, second, num_values: int):
+    # The one pair encoding: value ids a < b from different parameters become a * V + b.
+    # Works on ints and, elementwise, on NumPy arrays.
+    return first * num_values + second
+
+def all_pair_ids(sizes: List[int]) -> np.ndarray:
+    # Every pair of value ids from different parameters, in parameter-pair order
+    starts = value_starts(sizes)
+    num_values = sum(sizes)
+    blocks = [np.zeros(0, dtype=np.int64)]
+    for i, j in combinations(range(len(sizes)), 2):
+        first = np.arange(starts[i], starts[i] + sizes[i], dtype=np.int64)
+        second = np.arange(starts[j], starts[j] + sizes[j], dtype=np.int64)
+        blocks.append(encode_pair(first[:, None], second, num_values).ravel())
+    return np.concatenate(blocks).astype(np.int32)
+
+def generate_pairwise_combinations(parameters: Dict[str, List[str]]) -> np.ndarray:
+    _, sizes, _ = encode_parameters(freeze_parameters(parameters))
+    return all_pair_ids(sizes)
+
+def row_strides(sizes: List[int]) -> List[int]:
+    # Mixed-radix strides of itertools.product order: the last parameter varies fastest
+    strides = [1] * len(sizes)
+    for k in range(len(sizes) - 2, -1, -1):
+        strides[k] = strides[k + 1] * sizes[k + 1]
+    return strides
+
+def decode_row(parameters: Dict[str, List[str]], strides: List[int], row: int) -> Tuple[str, ...]:
+    return tuple(values[(row // stride) % len(values)] for values, stride in zip(parameters.values(), strides))
+
+def _pair_offsets(sizes: List[int]) -> Tuple[np.ndarray, int]:
+    # Every (param_i, param_j) pair owns a contiguous block of sizes[i] * sizes[j] bits
+    offsets = np.zeros((len(sizes), len(sizes)), dtype=np.int64)
+    num_pairs = 0
+    for i, j in combinations(range(len(sizes)), 2):
+        offsets[i, j] = num_pairs
+        num_pairs += sizes[i] * sizes[j]
+    return offsets, num_pairs
+
+@njit(cache=True, parallel=True, nogil=True)
+def _pairs_mask(rows, pair_offsets, sizes, num_words):
+    # One uint64 bitmask row per test case, given as value indices per parameter
+    num_rows, m = rows.shape
+    masks = np.zeros((num_rows, num_words), dtype=np.uint64)
+    for r in prange(num_rows):
+        for i in range(m):
+            for j in range(i + 1, m):
+                bit = pair_offsets[i, j] + rows[r, i] * sizes[j] + rows[r, j]
+                masks[r, bit >> 6] |= np.uint64(1) << np.uint64(bit & 63)
+    return masks
+
+_KERNEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "__pycache__", "row_mask_kernels")
+
+def _row_masks_source(m: int, cache: bool) -> str:
+    # The C(m, 2) pair loop fully unrolled for one parameter count, with offsets,
+    # sizes and strides hoisted into locals so the row body is straight-line code
+    lines = ["import numpy as np", "from numba import njit, prange", "",
+             f"@njit(cache={cache}, parallel=True, nogil=True)",
+             "def row_masks(pair_offsets, sizes, strides, num_rows, num_words):"]
+    lines += [f"    s{k} = sizes[{k}]; t{k} = strides[{k}]" for k in range(m)]
+    lines += [f"    o{i}_{j} = pair_offsets[{i}, {j}]" for i, j in combinations(range(m), 2)]
+    lines += ["    masks = np.zeros((num_rows, num_words), dtype=np.uint64)",
+              "    for r in prange(num_rows):"]
+    lines += [f"        v{k} = (r // t{k}) % s{k}" for k in range(m)]
+    for i, j in combinations(range(m), 2):
+        lines += [f"        bit = o{i}_{j} + v{i} * s{j} + v{j}",
+                  "        masks[r, bit >> 6] |= np.uint64(1) << np.uint64(bit & 63)"]
+    lines += ["    return masks", ""]
+    return "\n".join(lines)
+
+_row_masks_kernels = {}
+_row_masks_lock = threading.Lock()
+
+def _specialized_row_masks(m: int):
+    # Generated kernels are written to a real file so Numba's on-disk cache applies:
+    # each parameter count compiles once per environment, then loads like any cached kernel.
+    # Streamlit sessions share the process, so generation is serialised by the lock.
+    with _row_masks_lock:
+        if m not in _row_masks_kernels:
+            _row_masks_kernels[m] = _load_row_masks(m)
+        return _row_masks_kernels[m]
+
+def _load_row_masks(m: int):
+    source = _row_masks_source(m, cache=True)
+    path = os.path.join(_KERNEL_DIR, f"row_masks_{m}.py")
+    try:
+        os.makedirs(_KERNEL_DIR, exist_ok=True)
+        if _read_text(path) != source:
+            # Unique temp file plus atomic replace: other processes never see a partial kernel
+            fd, tmp_path = tempfile.mkstemp(dir=_KERNEL_DIR, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    f.write(source)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        # Registered in sys.modules so Numba can resolve the module when loading its cache
+        spec = importlib.util.spec_from_file_location(f"_row_masks_{m}", path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[spec.name] = module
+        spec.loader.exec_module(module)
+    except OSError:
+        # Read-only install: compile from memory, once per process
+        module = type(os)(f"_row_masks_{m}")
+        exec(_row_masks_source(m, cache=False), module.__dict__)
+    return module.row_masks
+
+def _read_text(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+def row_pair_masks(sizes: List[int]) -> np.ndarray:
+    # uint64[N, W] pair bitmask of every row of the product, without materialising it
+    offsets, num_pairs = _pair_offsets(sizes)
+    num_rows, num_words = math.prod(sizes), (num_pairs + 63) // 64
+    if num_pairs == 0:
+        return np.zeros((num_rows, num_words), dtype=np.uint64)
+    kernel = _specialized_row_masks(len(sizes))
+    return kernel(offsets, np.array(sizes, dtype=np.int64), np.array(row_strides(sizes), dtype=np.int64), num_rows, num_words)
+
+def test_case_masks(test_cases: List[List[str]], parameters: Dict[str, List[str]]) -> np.ndarray:
+    keys, sizes, value_ids = encode_parameters(freeze_parameters(parameters))
+    starts = value_starts(sizes)
+    rows = np.array([[value_ids[(key, value)] - start for key, start, value in zip(keys, starts, test)]
+                     for test in test_cases], dtype=np.int64).reshape(-1, len(sizes))
+    offsets, num_pairs = _pair_offsets(sizes)
+    return _pairs_mask(rows, offsets, np.array(sizes, dtype=np.int64), (num_pairs + 63) // 64)
+
+if hasattr(np, "bitwise_count"):  # NumPy >= 2.0
+    def popcount(mask: np.ndarray) -> int:
+        return int(np.bitwise_count(mask).sum())
+else:
+    def popcount(mask: np.ndarray) -> int:
+        # Fold the words into one Python int; int.bit_count() is a single popcount pass
+        return int.from_bytes(mask.tobytes(), "little").bit_count()
+
+_M1 = np.uint64(0x5555555555555555)
+_M2 = np.uint64(0x3333333333333333)
+_M4 = np.uint64(0x0F0F0F0F0F0F0F0F)
+_H01 = np.uint64(0x0101010101010101)
+
+@njit(cache=True)
+def popcount64(x):
+    # SWAR popcount, kept entirely in uint64 arithmetic
+    x = x - ((x >> np.uint64(1)) & _M1)
+    x = (x & _M2) + ((x >> np.uint64(2)) & _M2)
+    x = (x + (x >> np.uint64(4))) & _M4
+    return np.int64((x * _H01) >> np.uint64(56))
+
+def count_new_pairs(test_cases: List[List[str]], parameters: Dict[str, List[str]]) -> Tuple[np.ndarray, np.ndarray, List[int]]:
+    test_case_pairs = test_case_masks(test_cases, parameters)
+
+    # Running OR of the suite so far; each test only counts the bits it adds
+    covered_pairs = np.zeros(test_case_pairs.shape[1], dtype=np.uint64)
+    new_unique_counts = np.empty(len(test_case_pairs), dtype=np.int64)
+    for i, mask in enumerate(test_case_pairs):
+        new_unique_counts[i] = popcount(mask & ~covered_pairs)
+        covered_pairs |= mask
+
+    return covered_pairs, test_case_pairs, new_unique_counts.tolist()
@@ -1,20 +1,64 @@
-from itertools import combinations, product
+import math
+import os
+from contextlib import contextmanager
+from itertools import combinations
+import numpy as np
 from ortools.sat.python import cp_model
 import streamlit as st
+import greedyalgo
+from _pairs_core import count_new_pairs, decode_row, encode_pair, row_strides, value_starts
 
-def generate_pairwise_combinations(parameters):
-    param_keys = sorted(parameters.keys())  # Sort keys lexicographically
-    all_pairs = set()
+@contextmanager
+def _skip_boolean_checks(model):
+    # Older OR-Tools re-validates every literal in Python on each constraint call.
+    # All literals added here are fresh BoolVars, so shadow the check on this model only.
+    if not hasattr(model, "AssertIsBooleanVariable"):
+        yield
+        return
+    model.AssertIsBooleanVariable = lambda x: None
+    try:
+        yield
+    finally:
+        del model.AssertIsBooleanVariable
 
-    # Generate all pairs of parameters in lex order
-    for p1, p2 in combinations(param_keys, 2):
-        for v1 in parameters[p1]:
-            for v2 in parameters[p2]:
-                all_pairs.add(((p1, v1), (p2, v2)))
+def _pairs_with_rows(sizes):
+    # Single fused pass: every pair id together with the rows containing it,
+    # derived from the strides instead of walking the product
+    strides = row_strides(sizes)
+    starts = value_starts(sizes)
+    num_values = sum(sizes)
 
-    return list(all_pairs)
+    for i, j in combinations(range(len(sizes)), 2):
+        # Row offsets contributed by every parameter other than i and j
+        rest = np.zeros(1, dtype=np.int64)
+        for k, (size, stride) in enumerate(zip(sizes, strides)):
+            if k != i and k != j:
+                rest = (rest[:, None] + np.arange(size, dtype=np.int64) * stride).ravel()
 
-def find_minimum_test_suite(parameters):
+        for a in range(sizes[i]):
+            for b in range(sizes[j]):
+                yield encode_pair(starts[i] + a, starts[j] + b, num_values), a * strides[i] + b * strides[j] + rest
+
+def _greedy_indices(parameters):
+    # Row indices (in product order) of the test cases picked by the greedy algorithm,
+    # or None when the product is beyond the greedy solver's MAX_COMBINATIONS limit
+    try:
+        greedy_suite, _ = greedyalgo.find_minimum_test_suite(parameters)
+    except ValueError:
+        return None
+    value_index = [{value: k for k, value in enumerate(values)} for values in parameters.values()]
+    sizes = [len(values) for values in parameters.values()]
+
+    indices = set()
+    for test in greedy_suite:
+        row = 0
+        for lookup, size, value in zip(value_index, sizes, test):
+            row = row * size + lookup[value]
+        indices.add(row)
+    return indices
+
+def solve_test_suite(parameters):
+    # Same as find_minimum_test_suite, plus whether the suite was proven optimal
     if not isinstance(parameters, dict):
         raise TypeError("Parameters must be a dictionary")
     if not parameters:
@@ -22,56 +66,55 @@ def find_minimum_test_suite(parameters):
     if not all(isinstance(v, list) for v in parameters.values()):
         raise TypeError("All parameter values must be lists")
     
-    all_pairs = generate_pairwise_combinations(parameters)
-    param_keys = list(parameters.keys())
-    all_values = list(product(*parameters.values()))
+    sizes = [len(values) for values in parameters.values()]
+    strides = row_strides(sizes)
+    num_rows = math.prod(sizes)
 
     model = cp_model.CpModel()
-    test_case_vars = [model.NewBoolVar(f"tc_{i}") for i in range(len(all_values))]
-    pair_covered = {}
+    # Unnamed: no per-row name string is formatted and stored in the proto
+    test_case_vars = [model.NewBoolVar("") for _ in range(num_rows)]
 
-    for i, pair in enumerate(all_pairs):
-        pair_covered[i] = model.NewBoolVar(f"pair_{i}")
-        model.AddMaxEquality(pair_covered[i], [
-            test_case_vars[j] for j, test in enumerate(all_values)
-            if (pair[0] in zip(param_keys, test)) and (pair[1] in zip(param_keys, test))
-        ])
+    # Every pair must be covered by at least one selected test case
+    pair_ids = []
+    with _skip_boolean_checks(model):
+        for pair_id, rows in _pairs_with_rows(sizes):
+            pair_ids.append(pair_id)
+            model.AddBoolOr([test_case_vars[r] for r in rows.tolist()])
+    all_pairs = np.array(pair_ids, dtype=np.int32)
 
-    model.Add(sum(pair_covered.values()) == len(all_pairs))
-    model.Minimize(sum(test_case_vars))
+    model.Minimize(cp_model.LinearExpr.Sum(test_case_vars))
+
+    # Warm-start from the greedy suite, which is also an upper bound on the optimum;
+    # without it (too many rows for the greedy solver) CP-SAT searches from scratch
+    greedy_rows = _greedy_indices(parameters)
+    if greedy_rows is not None:
+        for r, var in enumerate(test_case_vars):
+            model.AddHint(var, 1 if r in greedy_rows else 0)
+        model.Add(cp_model.LinearExpr.Sum(test_case_vars) <= len(greedy_rows))
 
     solver = cp_model.CpSolver()
     solver.parameters.max_time_in_seconds = 300  # Add timeout
+    solver.parameters.num_workers = os.cpu_count() or 0  # Parallel portfolio search, 0 lets CP-SAT decide
+    solver.parameters.linearization_level = 2  # Stronger LP relaxation for set-cover style models
+    solver.parameters.log_search_progress = False
     status = solver.Solve(model)
 
     if status == cp_model.OPTIMAL:
-        optimal_suite = [all_values[i] for i in range(len(all_values)) if solver.Value(test_case_vars[i])]
-        return optimal_suite, all_pairs
+        optimal_suite = [decode_row(parameters, strides, i) for i in range(num_rows) if solver.Value(test_case_vars[i])]
+        return optimal_suite, all_pairs, True
     elif status == cp_model.FEASIBLE:
         st.warning("Found a solution, but it may not be optimal")
-        optimal_suite = [all_values[i] for i in range(len(all_values)) if solver.Value(test_case_vars[i])]
-        return optimal_suite, all_pairs
+        optimal_suite = [decode_row(parameters, strides, i) for i in range(num_rows) if solver.Value(test_case_vars[i])]
+        return optimal_suite, all_pairs, False
     else:
-        return None, None
+        return None, None, False
+
+def find_minimum_test_suite(parameters):
+    optimal_suite, all_pairs, _ = solve_test_suite(parameters)
+    return optimal_suite, all_pairs
 
 def count_unique_pairs(test_cases, all_pairs, parameters):
-    covered_pairs = set()
-    test_case_pairs = []
-    new_unique_counts = []
-
-    for test in test_cases:
-        current_covered = len(covered_pairs)
-        test_pairs = set()
-        for p1, p2 in combinations(zip(parameters.keys(), test), 2):
-            pair = tuple(sorted([p1, p2]))
-            if pair in all_pairs:
-                test_pairs.add(pair)
-        covered_pairs.update(test_pairs)
-        test_case_pairs.append(test_pairs)
-        new_unique = len(covered_pairs) - current_covered
-        new_unique_counts.append(new_unique)
-
-    return covered_pairs, test_case_pairs, new_unique_counts
+    return count_new_pairs(test_cases, parameters)
 
 # Parameter setup
 parameters = {
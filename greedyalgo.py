@@ -1,70 +1,62 @@
-from itertools import combinations, product
-from typing import Dict, List, Set, Tuple, Any
-
-def generate_pairwise_combinations(parameters: Dict[str, List[str]]) -> List[Tuple[Tuple[str, str], Tuple[str, str]]]:
-    param_keys = sorted(parameters.keys())
-    all_pairs = set()
-
-    for p1, p2 in combinations(param_keys, 2):
-        for v1 in parameters[p1]:
-            for v2 in parameters[p2]:
-                all_pairs.add(((p1, v1), (p2, v2)))
-
-    return list(all_pairs)
-
-def get_pairs_in_test(test: List[str], param_keys: List[str]) -> Set[Tuple[Tuple[str, str], Tuple[str, str]]]:
-    pairs = set()
-    for (p1, p2) in combinations(range(len(param_keys)), 2):
-        pair = ((param_keys[p1], test[p1]), (param_keys[p2], test[p2]))
-        pairs.add(tuple(sorted(pair)))
-    return pairs
-
-def find_minimum_test_suite(parameters: Dict[str, List[str]]) -> Tuple[List[List[str]], List[Tuple[Tuple[str, str], Tuple[str, str]]]]:
+import math
+from typing import Dict, List, Tuple
+
+import numpy as np
+from numba import njit, prange
+
+from _pairs_core import count_new_pairs, decode_row, generate_pairwise_combinations, popcount64, row_pair_masks, row_strides
+
+@njit(cache=True, parallel=True)
+def _score_candidates(cand_masks, covered):
+    num_rows, num_words = cand_masks.shape
+    new_pairs = np.zeros(num_rows, dtype=np.int64)
+    for r in prange(num_rows):
+        count = 0
+        for w in range(num_words):
+            count += popcount64(cand_masks[r, w] & ~covered[w])
+        new_pairs[r] = count
+    return new_pairs
+
+def find_minimum_test_suite(parameters: Dict[str, List[str]]) -> Tuple[List[List[str]], np.ndarray]:
     MAX_COMBINATIONS = 1000000  # Set reasonable limit
     
-    param_keys = list(parameters.keys())
-    all_values = list(product(*parameters.values()))
+    sizes = [len(values) for values in parameters.values()]
+    num_combinations = math.prod(sizes)
     
-    if len(all_values) > MAX_COMBINATIONS:
-        raise ValueError(f"Too many combinations: {len(all_values)}. Maximum allowed: {MAX_COMBINATIONS}")
+    if num_combinations > MAX_COMBINATIONS:
+        raise ValueError(f"Too many combinations: {num_combinations}. Maximum allowed: {MAX_COMBINATIONS}")
     
+    # Candidates only ever exist as mask rows; test cases are decoded from their row index
     all_pairs = generate_pairwise_combinations(parameters)
+    strides = row_strides(sizes)
+    cand_masks = row_pair_masks(sizes)
     
-    covered_pairs: Set[Tuple[Tuple[str, str], Tuple[str, str]]] = set()
+    covered = np.zeros(cand_masks.shape[1], dtype=np.uint64)
     test_suite: List[List[str]] = []
     
-    while len(covered_pairs) < len(all_pairs):
-        best_test = None
-        best_new_pairs = 0
-        
-        for test in all_values:
-            test_pairs = get_pairs_in_test(test, param_keys)
-            new_pairs = len(test_pairs - covered_pairs)
-            
-            if new_pairs > best_new_pairs:
-                best_new_pairs = new_pairs
-                best_test = test
+    # Active set: candidates that can still add pairs, kept in their original order
+    active_rows = np.arange(len(cand_masks))
+    
+    while len(active_rows):
+        # New pairs per candidate, scored in parallel across the active candidates
+        new_pairs = _score_candidates(cand_masks, covered)
+        best = int(np.argmax(new_pairs))
         
-        if best_test is None:
+        if new_pairs[best] == 0:
             break
             
-        test_suite.append(best_test)
-        covered_pairs.update(get_pairs_in_test(best_test, param_keys))
+        test_suite.append(decode_row(parameters, strides, int(active_rows[best])))
+        covered |= cand_masks[best]
+        
+        # Coverage only grows, so a candidate with nothing new now never will again.
+        # Compacting copies the matrix, so only do it once half of the pool is dead.
+        alive = new_pairs > 0
+        alive[best] = False
+        if 2 * np.count_nonzero(alive) <= len(active_rows):
+            cand_masks = cand_masks[alive]
+            active_rows = active_rows[alive]
     
     return test_suite, all_pairs
 
-def count_unique_pairs(test_cases: List[List[str]], all_pairs: List[Tuple[Tuple[str, str], Tuple[str, str]]], parameters: Dict[str, List[str]]) -> Tuple[Set[Any], List[Set[Any]], List[int]]:
-    covered_pairs = set()
-    test_case_pairs = []
-    new_unique_counts = []
-    param_keys = list(parameters.keys())
-
-    for test in test_cases:
-        current_covered = len(covered_pairs)
-        test_pairs = get_pairs_in_test(test, param_keys)
-        covered_pairs.update(test_pairs)
-        test_case_pairs.append(test_pairs)
-        new_unique = len(covered_pairs) - current_covered
-        new_unique_counts.append(new_unique)
-
-    return covered_pairs, test_case_pairs, new_unique_counts 
\ No newline at end of file
+def count_unique_pairs(test_cases: List[List[str]], all_pairs: np.ndarray, parameters: Dict[str, List[str]]) -> Tuple[np.ndarray, np.ndarray, List[int]]:
+    return count_new_pairs(test_cases, parameters)
\ No newline at end of file
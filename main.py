@@ -1,6 +1,10 @@
+import threading
+from collections import OrderedDict
+import pandas as pd
 import streamlit as st
 import algo
 import greedyalgo
+from _pairs_core import freeze_parameters
 from ast import literal_eval
 
 def initialize_session_state():
@@ -13,14 +17,74 @@ def initialize_session_state():
             'Screen Size': ['Hand-held', 'laptop', 'fullsize']
         }
     
+    # Cross-parameter value index used by the duplicate check
+    if 'values_index' not in st.session_state:
+        st.session_state.values_index = {}
+        st.session_state.all_values = set()
+        for param, values in st.session_state.parameters.items():
+            _index_parameter_values(param, values)
+    
     # Add version tracking
     if 'version' not in st.session_state:
         st.session_state.version = "1.0"
 
+def _index_parameter_values(param, values):
+    """Record a parameter's values in the duplicate index"""
+    st.session_state.values_index[param] = set(values)
+    st.session_state.all_values.update(values)
+
+def _unindex_parameter_values(param):
+    """Drop a parameter's values from the duplicate index"""
+    st.session_state.all_values.difference_update(st.session_state.values_index.pop(param, set()))
+
 def initialize_algorithm_state():
     if 'algorithm' not in st.session_state:
         st.session_state.algorithm = 'CP-SAT'
 
+def _thaw_parameters(param_items):
+    return {param: list(values) for param, values in param_items}
+
+_MAX_OPTIMAL_SUITES = 32
+
+@st.cache_resource
+def _optimal_suites():
+    # Proven CP-SAT optima by parameter snapshot, shared across sessions, oldest evicted first
+    return OrderedDict(), threading.Lock()
+
+def _get_optimal_suite(param_items):
+    suites, lock = _optimal_suites()
+    with lock:
+        return suites.get(param_items)
+
+def _store_optimal_suite(param_items, result):
+    suites, lock = _optimal_suites()
+    with lock:
+        suites[param_items] = result
+        while len(suites) > _MAX_OPTIMAL_SUITES:
+            suites.popitem(last=False)
+
+def _cached_cpsat(param_items):
+    # Only proven optima are stored; a timed-out or failed solve is retried on the next click
+    result = _get_optimal_suite(param_items)
+    if result is None:
+        optimal_tests, all_pairs, is_optimal = algo.solve_test_suite(_thaw_parameters(param_items))
+        result = optimal_tests, all_pairs
+        if is_optimal:
+            _store_optimal_suite(param_items, result)
+    return result
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _cached_cpsat_counts(test_cases, all_pairs, param_items):
+    return algo.count_unique_pairs(test_cases, all_pairs, _thaw_parameters(param_items))
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _cached_greedy(param_items):
+    return greedyalgo.find_minimum_test_suite(_thaw_parameters(param_items))
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _cached_greedy_counts(test_cases, all_pairs, param_items):
+    return greedyalgo.count_unique_pairs(test_cases, all_pairs, _thaw_parameters(param_items))
+
 def validate_parameter_name(name):
     """Validate parameter name"""
     if not name or not name.strip():
@@ -64,12 +128,9 @@ def validate_parameter_values(values, current_param=None):
         return False, [], "Duplicate values are not allowed within a parameter"
     
     # Check for duplicates across all parameters
-    all_other_values = set()
-    for param, param_values in st.session_state.parameters.items():
-        if param != current_param:  # Skip the current parameter when updating
-            all_other_values.update(param_values)
-    
-    duplicates = set(values_list) & all_other_values
+    all_values = st.session_state.all_values
+    own_values = st.session_state.values_index.get(current_param, set())  # Skip the current parameter when updating
+    duplicates = {v for v in values_list if v in all_values and v not in own_values}
     if duplicates:
         return False, [], f"Values {', '.join(duplicates)} already exist in other parameters"
     
@@ -79,6 +140,100 @@ def validate_parameter_values(values, current_param=None):
         
     return True, values_list, ""
 
+def _show_notice(key):
+    """Show a message left in session state by a callback or before a rerun"""
+    notice = st.session_state.pop(key, None)
+    if notice:
+        kind, text = notice
+        getattr(st, kind)(text)
+
+def _add_parameter():
+    new_param = st.session_state.new_param
+    name_valid, name_error = validate_parameter_name(new_param)
+    if not name_valid:
+        st.session_state.add_notice = ("error", name_error)
+        return
+    values_valid, values_list, values_error = validate_parameter_values(st.session_state.new_values)
+    if not values_valid:
+        st.session_state.add_notice = ("error", values_error)
+        return
+    st.session_state.parameters[new_param.strip()] = values_list
+    _index_parameter_values(new_param.strip(), values_list)
+    st.session_state.add_notice = ("success", f"Added {new_param}")
+    # Inputs are only cleared once the parameter is added, so a rejected entry can be fixed
+    st.session_state.new_param = ""
+    st.session_state.new_values = ""
+
+def _clear_parameters():
+    st.session_state.parameters = {}
+    st.session_state.values_index = {}
+    st.session_state.all_values = set()
+    st.session_state.new_param = ""
+    st.session_state.new_values = ""
+    st.session_state.clear_notice = ("success", "All parameters cleared")
+
+def _delete_parameter(param):
+    del st.session_state.parameters[param]
+    _unindex_parameter_values(param)
+    st.session_state.parameters_changed = True
+    # The row is gone, so the message is shown at the top of the list
+    if len(st.session_state.parameters) == 1:
+        st.session_state.delete_notice = ("warning", "Only 1 parameter remaining. Add more parameters to generate test cases.")
+    else:
+        st.session_state.delete_notice = ("success", f"Deleted {param}")
+
+def _invalidate_results():
+    # Generated results sit outside the fragment and describe the old parameters;
+    # a full rerun clears them, as an edit did before the list became a fragment
+    if st.session_state.get("results_shown"):
+        st.rerun()
+
+@st.fragment
+def render_current_parameters():
+    # Edit existing parameters; as a fragment, Update/Delete rerun only this section
+    st.subheader("Current Parameters")
+    if st.session_state.pop("parameters_changed", False):
+        _invalidate_results()
+    _show_notice("delete_notice")
+    
+    # Create a container for parameters with custom styling
+    with st.container():
+        for param in list(st.session_state.parameters.keys()):
+            # Add a visual separator between parameters
+            st.markdown("---")
+            
+            # Create three columns with better proportions
+            col1, col2, col3, col4 = st.columns([1, 2, 0.5, 0.5])
+            
+            with col1:
+                st.markdown(f"**{param}**")
+            
+            with col2:
+                values = st.text_input(
+                    "Values",
+                    value=", ".join(st.session_state.parameters[param]),
+                    key=f"input_{param}",
+                    label_visibility="collapsed"
+                )
+            
+            with col3:
+                if st.button("📝 Update", key=f"update_{param}", use_container_width=True):
+                    values_valid, values_list, values_error = validate_parameter_values(values, current_param=param)
+                    if not values_valid:
+                        st.error(values_error)
+                    else:
+                        st.session_state.parameters[param] = values_list
+                        _unindex_parameter_values(param)
+                        _index_parameter_values(param, values_list)
+                        st.session_state[f"notice_{param}"] = ("success", f"Updated {param}")
+                        _invalidate_results()
+                _show_notice(f"notice_{param}")
+            
+            with col4:
+                # Deleted in the click callback, before the fragment redraws the list
+                st.button("🗑️ Delete", key=f"delete_{param}", use_container_width=True,
+                          on_click=_delete_parameter, args=(param,))
+
 def main():
     st.set_page_config(layout="wide")
     st.title("Pairwise Test Case Generator")
@@ -87,13 +242,6 @@ def main():
     initialize_session_state()
     initialize_algorithm_state()
     
-    if 'clear_fields' in st.session_state and st.session_state.clear_fields:
-        # Reset the clear_fields flag
-        st.session_state.clear_fields = False
-        # Initialize empty input fields
-        st.session_state.new_param = ""
-        st.session_state.new_values = ""
-
     st.markdown("""
     ### Instructions
     1. The exmaples are given as default values for the parameters.
@@ -126,74 +274,23 @@ def main():
     # Parameter management section
     st.subheader("Parameter Management")
     
-    # Add Clear All button and new parameter controls in the same row
-    with st.container():
+    # Add Clear All button and new parameter controls in the same row; as a form,
+    # typing does not rerun the app. Both buttons act in callbacks before the rerun.
+    with st.form("add_parameter", border=False):
         col1, col2, col3, col4 = st.columns([1, 2, 0.7, 0.3])
         with col1:
-            new_param = st.text_input("New Parameter Name", key="new_param")
+            st.text_input("New Parameter Name", key="new_param")
         with col2:
-            new_values = st.text_input("Values (comma-separated)", key="new_values")
+            st.text_input("Values (comma-separated)", key="new_values")
         with col3:
-            if st.button("Add Parameter", use_container_width=True):
-                name_valid, name_error = validate_parameter_name(new_param)
-                if name_valid:
-                    values_valid, values_list, values_error = validate_parameter_values(new_values)
-                    if values_valid:
-                        st.session_state.parameters[new_param.strip()] = values_list
-                        st.success(f"Added {new_param}")
-                        st.session_state.clear_fields = True
-                        st.rerun()
-                    else:
-                        st.error(values_error)
-                else:
-                    st.error(name_error)
+            st.form_submit_button("Add Parameter", use_container_width=True, on_click=_add_parameter)
+            _show_notice("add_notice")
         with col4:
-            if st.button("Clear All", type="secondary", use_container_width=True):
-                st.session_state.parameters = {}
-                st.session_state.clear_fields = True
-                st.success("All parameters cleared")
-                st.rerun()
+            st.form_submit_button("Clear All", type="secondary", use_container_width=True,
+                                  on_click=_clear_parameters)
+            _show_notice("clear_notice")
 
-    # Edit existing parameters
-    st.subheader("Current Parameters")
-    
-    # Create a container for parameters with custom styling
-    with st.container():
-        for param in list(st.session_state.parameters.keys()):
-            # Add a visual separator between parameters
-            st.markdown("---")
-            
-            # Create three columns with better proportions
-            col1, col2, col3, col4 = st.columns([1, 2, 0.5, 0.5])
-            
-            with col1:
-                st.markdown(f"**{param}**")
-            
-            with col2:
-                values = st.text_input(
-                    "Values",
-                    value=", ".join(st.session_state.parameters[param]),
-                    key=f"input_{param}",
-                    label_visibility="collapsed"
-                )
-            
-            with col3:
-                if st.button("📝 Update", key=f"update_{param}", use_container_width=True):
-                    values_valid, values_list, values_error = validate_parameter_values(values, current_param=param)
-                    if not values_valid:
-                        st.error(values_error)
-                    else:
-                        st.session_state.parameters[param] = values_list
-                        st.success(f"Updated {param}")
-            
-            with col4:
-                if st.button("🗑️ Delete", key=f"delete_{param}", use_container_width=True):
-                    del st.session_state.parameters[param]
-                    if len(st.session_state.parameters) == 1:
-                        st.warning("Only 1 parameter remaining. Add more parameters to generate test cases.")
-                    else:
-                        st.success(f"Deleted {param}")
-                    st.rerun()
+    render_current_parameters()
 
     # Generate test cases section
     st.markdown("---")
@@ -203,6 +300,8 @@ def main():
     col1, col2, col3 = st.columns([1, 1, 1])
     with col2:
         generate_button = st.button("Generate Test Cases", use_container_width=True)
+    # Lets a parameter edit in the fragment know whether there is output below to clear
+    st.session_state.results_shown = generate_button
     
     if generate_button:
         # Validate the entire parameter set
@@ -219,18 +318,20 @@ def main():
             st.error("Please add at least 2 parameters")
             return
             
+        # Cached on the parameter snapshot, so unchanged inputs skip the solve entirely
+        param_items = freeze_parameters(st.session_state.parameters)
         with st.spinner("Generating optimal test suite..."):
             if st.session_state.algorithm == 'CP-SAT':
-                optimal_tests, all_pairs = algo.find_minimum_test_suite(st.session_state.parameters)
+                optimal_tests, all_pairs = _cached_cpsat(param_items)
                 if optimal_tests:
-                    covered_pairs, test_case_pairs, new_unique_counts = algo.count_unique_pairs(
-                        optimal_tests, all_pairs, st.session_state.parameters
+                    covered_pairs, test_case_pairs, new_unique_counts = _cached_cpsat_counts(
+                        optimal_tests, all_pairs, param_items
                     )
             else:  # Greedy algorithm
-                optimal_tests, all_pairs = greedyalgo.find_minimum_test_suite(st.session_state.parameters)
+                optimal_tests, all_pairs = _cached_greedy(param_items)
                 if optimal_tests:
-                    covered_pairs, test_case_pairs, new_unique_counts = greedyalgo.count_unique_pairs(
-                        optimal_tests, all_pairs, st.session_state.parameters
+                    covered_pairs, test_case_pairs, new_unique_counts = _cached_greedy_counts(
+                        optimal_tests, all_pairs, param_items
                     )
 
             if optimal_tests:
@@ -248,17 +349,14 @@ def main():
                 # Create a table of test cases
                 st.subheader("Test Cases")
                 
-                # Prepare data for the table
-                table_data = []
-                headers = ["Test Case #"] + list(st.session_state.parameters.keys()) + ["New Unique Pairs"]
-                
-                for i, test in enumerate(optimal_tests, 1):
-                    row = [f"Test {i}"] + list(test) + [new_unique_counts[i-1]]
-                    table_data.append(row)
+                # Prepare data for the table, one list per column
+                col_data = {"Test Case #": [f"Test {i}" for i in range(1, len(optimal_tests) + 1)]}
+                for param, values in zip(st.session_state.parameters.keys(), zip(*optimal_tests)):
+                    col_data[param] = list(values)
+                col_data["New Unique Pairs"] = list(new_unique_counts)
                 
                 # Display as a DataFrame with improved styling
-                import pandas as pd
-                df = pd.DataFrame(table_data, columns=headers)
+                df = pd.DataFrame(col_data)
                 st.dataframe(
                     df,
                     use_container_width=True,